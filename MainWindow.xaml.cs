@@ -73,9 +73,17 @@ namespace WpfLatheGCodeConverter
                     {
                         var jsonText = File.ReadAllText(wrapper.LastJsonPath);
                         int directCount = 0;
-                        // quick heuristic: count occurrences of '"type": "polyline"' (case-insensitive)
-                        directCount = jsonText.Split(new[] { "\"type\"" }, StringSplitOptions.None)
-                                              .Count(s => s.IndexOf("polyline", StringComparison.OrdinalIgnoreCase) >= 0);
+                        if (jsonText.TrimStart().StartsWith("{"))
+                        {
+                            // columnar output: one polyline point array per line
+                            directCount = jsonText.Split('\n').Count(s => s.StartsWith("[["));
+                        }
+                        else
+                        {
+                            // quick heuristic: count occurrences of '"type": "polyline"' (case-insensitive)
+                            directCount = jsonText.Split(new[] { "\"type\"" }, StringSplitOptions.None)
+                                                  .Count(s => s.IndexOf("polyline", StringComparison.OrdinalIgnoreCase) >= 0);
+                        }
                         sb.AppendLine("Direct JSON polyline (heuristic) count: " + directCount);
                     }
                     catch (Exception ex)
@@ -162,9 +162,9 @@ namespace WpfLatheGCodeConverter.Services
                 string exec = py.exe;
                 string args;
                 if (py.type == PythonType.PyLauncher)
-                    args = $"-3 \"{scriptPath}\" \"{dxfPath}\" \"{outJson}\" --approx-segs 48 --explode-inserts --verbose";
+                    args = $"-3 \"{scriptPath}\" \"{dxfPath}\" \"{outJson}\" --approx-segs 48 --explode-inserts --columnar --verbose";
                 else
-                    args = $"\"{scriptPath}\" \"{dxfPath}\" \"{outJson}\" --approx-segs 48 --explode-inserts --verbose";
+                    args = $"\"{scriptPath}\" \"{dxfPath}\" \"{outJson}\" --approx-segs 48 --explode-inserts --columnar --verbose";
 
                 logSb.AppendLine("Running: " + exec + " " + args);
                 File.WriteAllText(tempLog, logSb.ToString()); // write intermediate log
@@ -215,6 +215,13 @@ namespace WpfLatheGCodeConverter.Services
                 if (string.IsNullOrWhiteSpace(jsonText)) return gm;
 
                 using var doc = JsonDocument.Parse(jsonText);
+
+                // --columnar output: { "polylines": [...], "circles": {...}, "arcs": {...} }
+                if (doc.RootElement.ValueKind == JsonValueKind.Object)
+                {
+                    ReadColumnar(doc.RootElement, gm);
+                    return gm;
+                }
                 if (doc.RootElement.ValueKind != JsonValueKind.Array) return gm;
 
                 foreach (var elem in doc.RootElement.EnumerateArray())
@@ -226,29 +233,7 @@ namespace WpfLatheGCodeConverter.Services
                     {
                         if (elem.TryGetProperty("points", out var ptsElem) && ptsElem.ValueKind == JsonValueKind.Array)
                         {
-                            var pl = new List<(double X, double Y)>();
-                            foreach (var p in ptsElem.EnumerateArray())
-                            {
-                                if (p.ValueKind == JsonValueKind.Array && p.GetArrayLength() >= 2)
-                                {
-                                    if (p[0].TryGetDouble(out var x) && p[1].TryGetDouble(out var y))
-                                        pl.Add((x, y));
-                                    else
-                                    {
-                                        // try parse as string
-                                        double xx = double.NaN, yy = double.NaN;
-                                        if (p[0].ValueKind == JsonValueKind.String) double.TryParse(p[0].GetString(), out xx);
-                                        if (p[1].ValueKind == JsonValueKind.String) double.TryParse(p[1].GetString(), out yy);
-                                        if (!double.IsNaN(xx) && !double.IsNaN(yy)) pl.Add((xx, yy));
-                                    }
-                                }
-                                else if (p.ValueKind == JsonValueKind.Object)
-                                {
-                                    double x = SafeGetDoubleFromProperty(p, "x", "X", "cx");
-                                    double y = SafeGetDoubleFromProperty(p, "y", "Y", "cy");
-                                    if (!double.IsNaN(x) && !double.IsNaN(y)) pl.Add((x, y));
-                                }
-                            }
+                            var pl = ParsePoints(ptsElem);
                             if (pl.Count > 0) gm.Polylines.Add(pl);
                         }
                     }
@@ -288,6 +273,108 @@ namespace WpfLatheGCodeConverter.Services
             }
         }
 
+        private static void ReadColumnar(JsonElement root, GeometryModel gm)
+        {
+            // Parametric tables carry "i", the record's position in the array layout; polylines take the
+            // positions left over. Sorting on it keeps gm.Polylines (and so the toolpath order) the same
+            // as for array output. Tables without "i" go last, as before.
+            var items = new List<(double Index, List<(double X, double Y)> Points)>();
+            var taken = new HashSet<double>();
+            foreach (var table in root.EnumerateObject())
+            {
+                if (table.Value.ValueKind == JsonValueKind.Object)
+                    taken.UnionWith(GetColumn(table.Value, "i"));
+            }
+
+            if (root.TryGetProperty("circles", out var circles) && circles.ValueKind == JsonValueKind.Object)
+            {
+                var cx = GetColumn(circles, "cx");
+                var cy = GetColumn(circles, "cy");
+                var r = GetColumn(circles, "r");
+                var idx = GetColumn(circles, "i");
+                int n = Math.Min(cx.Length, Math.Min(cy.Length, r.Length));
+                for (int i = 0; i < n; i++)
+                {
+                    double at = i < idx.Length ? idx[i] : double.PositiveInfinity;
+                    if (!double.IsNaN(cx[i]) && !double.IsNaN(cy[i]) && !double.IsNaN(r[i]))
+                        items.Add((at, ApproximateCircle(cx[i], cy[i], r[i], 48)));
+                }
+            }
+
+            if (root.TryGetProperty("arcs", out var arcs) && arcs.ValueKind == JsonValueKind.Object)
+            {
+                var cx = GetColumn(arcs, "cx");
+                var cy = GetColumn(arcs, "cy");
+                var r = GetColumn(arcs, "r");
+                var sa = GetColumn(arcs, "start");
+                var ea = GetColumn(arcs, "end");
+                var idx = GetColumn(arcs, "i");
+                int n = Math.Min(Math.Min(cx.Length, cy.Length), Math.Min(r.Length, Math.Min(sa.Length, ea.Length)));
+                for (int i = 0; i < n; i++)
+                {
+                    double at = i < idx.Length ? idx[i] : double.PositiveInfinity;
+                    if (!double.IsNaN(cx[i]) && !double.IsNaN(cy[i]) && !double.IsNaN(r[i]))
+                        items.Add((at, ApproximateArc(cx[i], cy[i], r[i], sa[i], ea[i], 36)));
+                }
+            }
+
+            if (root.TryGetProperty("polylines", out var polys) && polys.ValueKind == JsonValueKind.Array)
+            {
+                int pos = 0;
+                foreach (var ptsElem in polys.EnumerateArray())
+                {
+                    while (taken.Contains(pos)) pos++;
+                    if (ptsElem.ValueKind == JsonValueKind.Array)
+                        items.Add((pos, ParsePoints(ptsElem)));
+                    pos++;
+                }
+            }
+
+            // OrderBy is stable, so entries without a position keep circles-then-arcs order
+            foreach (var item in items.OrderBy(it => it.Index))
+            {
+                if (item.Points.Count > 0) gm.Polylines.Add(item.Points);
+            }
+        }
+
+        private static double[] GetColumn(JsonElement table, string name)
+        {
+            if (!table.TryGetProperty(name, out var col) || col.ValueKind != JsonValueKind.Array)
+                return Array.Empty<double>();
+            var values = new double[col.GetArrayLength()];
+            int i = 0;
+            foreach (var v in col.EnumerateArray()) values[i++] = SafeGetDoubleFromJson(v);
+            return values;
+        }
+
+        private static List<(double X, double Y)> ParsePoints(JsonElement ptsElem)
+        {
+            var pl = new List<(double X, double Y)>();
+            foreach (var p in ptsElem.EnumerateArray())
+            {
+                if (p.ValueKind == JsonValueKind.Array && p.GetArrayLength() >= 2)
+                {
+                    if (p[0].TryGetDouble(out var x) && p[1].TryGetDouble(out var y))
+                        pl.Add((x, y));
+                    else
+                    {
+                        // try parse as string
+                        double xx = double.NaN, yy = double.NaN;
+                        if (p[0].ValueKind == JsonValueKind.String) double.TryParse(p[0].GetString(), out xx);
+                        if (p[1].ValueKind == JsonValueKind.String) double.TryParse(p[1].GetString(), out yy);
+                        if (!double.IsNaN(xx) && !double.IsNaN(yy)) pl.Add((xx, yy));
+                    }
+                }
+                else if (p.ValueKind == JsonValueKind.Object)
+                {
+                    double x = SafeGetDoubleFromProperty(p, "x", "X", "cx");
+                    double y = SafeGetDoubleFromProperty(p, "y", "Y", "cy");
+                    if (!double.IsNaN(x) && !double.IsNaN(y)) pl.Add((x, y));
+                }
+            }
+            return pl;
+        }
+
         private static double SafeGetDoubleFromJson(JsonElement el)
         {
             try
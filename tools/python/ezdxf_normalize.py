@@ -3,19 +3,31 @@
 ezdxf_normalize.py - improved
 
 Usage:
-  python ezdxf_normalize.py input.dxf output.json [--approx-segs N] [--explode-inserts] [--verbose]
+  python ezdxf_normalize.py input.dxf output.json [--approx-segs N] [--explode-inserts] [--no-arc-polyline]
+                            [--precision N] [--columnar] [--workers N] [--verbose]
 
 Features:
  - Uses ezdxf.recover to read many DXF versions.
- - Emits polylines (approximated arcs/circles/ellipses/splines) and separate circle/arc records.
+ - Emits polylines (approximated arcs/circles/ellipses/splines) and separate circle/arc records;
+   zero-radius circles and arcs become "point" records.
  - When --explode-inserts is present, expands BLOCK INSERT entities (applies scale/rotation/translation).
+ - --no-arc-polyline drops the sampled polyline wherever the circle/arc record is exact.
+ - --precision sets the decimal places kept for coordinates (default 6).
+ - --columnar writes {"polylines": [...], "circles": {...}, "arcs": {...}, "points": {...}} instead of a
+   record array; each table has an "i" column with the record's position in the array layout.
+ - --workers N splits entity processing across processes; every worker parses the whole DXF.
+ - Optional: orjson (faster JSON encoding) and numba (compiled sampling/transform kernels) are used
+   when installed.
  - Writes verbose diagnostics to stdout/stderr (EzDxfWrapper captures these into a temp log).
 """
 import sys
 import json
 import math
 import os
+import mmap
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 
 try:
     import ezdxf
@@ -24,184 +36,777 @@ except Exception as ex:
     print("ERROR: missing ezdxf module. Install with: pip install ezdxf", file=sys.stderr)
     sys.exit(2)
 
+import numpy as np  # hard dependency of ezdxf, always present alongside it
 
-def rot_point(x, y, ang_deg):
-    ang = math.radians(ang_deg)
-    ca = math.cos(ang)
-    sa = math.sin(ang)
-    rx = x * ca - y * sa
-    ry = x * sa + y * ca
-    return rx, ry
-
-
-def transform_point(pt, insert, sx, sy, rotation):
-    # pt: (x,y)
-    # scale (sx, sy), rotate rotation degrees, then translate by insert (ix,iy)
-    x = pt[0] * sx
-    y = pt[1] * sy
-    rx, ry = rot_point(x, y, rotation)
-    return [rx + insert[0], ry + insert[1]]
-
-
-def sample_arc(cx, cy, r, start_deg, end_deg, segments=36):
-    start = math.radians(start_deg)
-    end = math.radians(end_deg)
-    if end < start:
-        end += 2 * math.pi
-    pts = []
-    for i in range(segments + 1):
-        t = start + (end - start) * (i / segments)
-        pts.append([cx + r * math.cos(t), cy + r * math.sin(t)])
-    return pts
-
-
-def sample_circle(cx, cy, r, segments=48):
-    pts = []
-    for i in range(segments):
-        t = 2 * math.pi * i / segments
-        pts.append([cx + r * math.cos(t), cy + r * math.sin(t)])
-    if len(pts) > 0:
-        pts.append(pts[0])
-    return pts
-
-
-def spline_to_poly(spline, segments=48):
-    # Best-effort sampling: prefer fit_points, then control points, otherwise sample via spline.approximation()
-    try:
-        if hasattr(spline, "fit_points") and spline.fit_points:
-            pts = [list(map(float, p)) for p in spline.fit_points]
-            return pts
-        # ezdxf 1.4 provides spline.eval or spline.control_points; fallback simple sampling of control points
-        control = [list(p) for p in getattr(spline, "control_points", [])]
-        if control:
-            pts = []
-            for i in range(segments + 1):
-                idx = int(i / segments * (len(control) - 1))
-                pts.append(control[idx])
-            return pts
-    except Exception as ex:
-        print("Warning: spline_to_poly failed: " + str(ex), file=sys.stderr)
-    return []
-
-
-def process_entity(e, out, approx_segs, explode_blocks, verbose, doc, parent_transform=None):
-    t = e.dxftype()
-    if verbose:
-        print(f"Processing entity: {t}", file=sys.stderr)
+try:
+    import orjson  # optional: faster serialization with native ndarray support
+except ImportError:
+    orjson = None
 
-    if t == "LINE":
+try:
+    from numba import njit  # optional: compiles the sampling/transform kernels below
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _arcs_kernel(cx, cy, r, start, end, out):
+        # out: (N, n+1, 2); arc k runs from start[k] to end[k] radians in n equal steps
+        n = out.shape[1] - 1
+        for k in range(out.shape[0]):
+            d = (end[k] - start[k]) / n
+            for i in range(n + 1):
+                t = start[k] + d * i
+                out[k, i, 0] = cx[k] + r[k] * math.cos(t)
+                out[k, i, 1] = cy[k] + r[k] * math.sin(t)
+
+    @njit(cache=True, fastmath=True)
+    def _affine_kernel(pts, M, t, out):
+        for i in range(pts.shape[0]):
+            x = pts[i, 0]
+            y = pts[i, 1]
+            out[i, 0] = M[0, 0] * x + M[0, 1] * y + t[0]
+            out[i, 1] = M[1, 0] * x + M[1, 1] * y + t[1]
+else:
+    _arcs_kernel = None
+    _affine_kernel = None
+
+
+def make_xform(insert, sx, sy, rotation):
+    # INSERT placement as an affine pair (M, t): scale (sx, sy), rotate rotation degrees, translate by insert.
+    if rotation % 360.0 == 0.0:
+        # exact, so apply_xform() recognises the transform as axis-aligned (sin(2*pi) is not 0.0)
+        ca, sa = 1.0, 0.0
+    else:
+        rad = math.radians(rotation)
+        ca = math.cos(rad)
+        sa = math.sin(rad)
+    M = np.array([[sx * ca, -sy * sa], [sx * sa, sy * ca]])
+    t = np.array([float(insert[0]), float(insert[1])])
+    return M, t
+
+
+def compose_xform(outer, inner):
+    # Transform equivalent to applying inner first, then outer.
+    if outer is None:
+        return inner
+    Mo, to = outer
+    Mi, ti = inner
+    return Mo @ Mi, Mo @ ti + to
+
+
+def apply_xform(pts, xform):
+    # pts: sequence or (n, 2) array of points; returns an (n, 2) array.
+    M, t = xform
+    pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    if M[0, 1] == 0.0 and M[1, 0] == 0.0:
+        # axis-aligned (no rotation): translate only, or per-axis scale + translate
+        sx = M[0, 0]; sy = M[1, 1]
+        if sx == 1.0 and sy == 1.0:
+            return pts + t
+        return pts * (sx, sy) + t
+    if _affine_kernel is not None:
+        out = np.empty((len(pts), 2))
+        _affine_kernel(pts, M, t, out)
+        return out
+    return pts @ M.T + t
+
+
+def point_xformer(xform):
+    # Pure-Python transform for a handful of points (LINE endpoints, arc centres): unpacks (M, t) once
+    # and returns f(x, y) -> (x', y'), avoiding the ndarray round-trip that dominates for 1-2 points.
+    (a, b), (c, d) = xform[0].tolist()
+    tx, ty = xform[1].tolist()
+    return lambda x, y: (a * x + b * y + tx, c * x + d * y + ty)
+
+
+@functools.lru_cache(maxsize=None)
+def unit_circle(segments):
+    # (cos, sin) of segments equally spaced angles over a full turn, shared by every circle and ellipse
+    # with that segment count; read-only since the arrays are cached.
+    a = np.linspace(0.0, 2 * math.pi, segments, endpoint=False)
+    c = np.cos(a)
+    s = np.sin(a)
+    c.setflags(write=False)
+    s.setflags(write=False)
+    return c, s
+
+
+def sample_arcs(centers, radii, start_deg, end_deg, segments=36):
+    # centers: (N, 2); radii, start_deg, end_deg: (N,). Returns an (N, segments+1, 2) float64 array.
+    start = np.radians(np.asarray(start_deg, dtype=np.float64))
+    end = np.radians(np.asarray(end_deg, dtype=np.float64))
+    end = np.where(end < start, end + 2 * math.pi, end)
+    r = np.asarray(radii, dtype=np.float64)
+    xy = np.empty((len(r), segments + 1, 2))
+    if _arcs_kernel is not None:
+        _arcs_kernel(np.ascontiguousarray(centers[:, 0]), np.ascontiguousarray(centers[:, 1]), r, start, end, xy)
+        return xy
+    # Arcs with the same sweep share one unit arc (cos/sin of k*d, k = 0..segments); each arc is then
+    # rotated onto its start angle with the angle-addition formulas, so trig runs once per distinct
+    # sweep plus once per arc instead of once per sample. Pays off for fillets, slots and hole patterns.
+    sweeps, which = np.unique(end - start, return_inverse=True)
+    k = sweeps[:, None] * (np.arange(segments + 1) / segments)
+    uc = np.cos(k)[which]
+    us = np.sin(k)[which]
+    cs = np.cos(start)[:, None]
+    ss = np.sin(start)[:, None]
+    r = r[:, None]
+    xy[:, :, 0] = centers[:, 0:1] + r * (cs * uc - ss * us)
+    xy[:, :, 1] = centers[:, 1:2] + r * (ss * uc + cs * us)
+    return xy
+
+
+def sample_circles(centers, radii, segments=48):
+    # Closed loops built from the cached unit circle: (N, 2) centers, (N,) radii -> (N, segments+1, 2).
+    # Only multiplies and adds per sample; no trig per circle.
+    n = len(radii)
+    if segments <= 0:
+        return np.empty((n, 0, 2))
+    uc, us = unit_circle(segments)
+    r = np.asarray(radii, dtype=np.float64)[:, None]
+    xy = np.empty((n, segments + 1, 2))
+    xy[:, :segments, 0] = centers[:, 0:1] + r * uc
+    xy[:, :segments, 1] = centers[:, 1:2] + r * us
+    xy[:, segments] = xy[:, 0]
+    return xy
+
+
+def _json_default(o):
+    # Sampled geometry stays as ndarrays until serialization.
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _round_value(v, ndigits):
+    # Coordinates rounded to ndigits decimals; "+ 0.0" folds -0.0 into 0.0.
+    if isinstance(v, (list, tuple, np.ndarray)):
+        a = np.asarray(v)
+        if a.dtype.kind in "iu":
+            # integer columns (the columnar "i" positions) are not coordinates
+            return v
+        return np.round(a.astype(np.float64, copy=False), ndigits) + 0.0
+    if isinstance(v, float):
+        return round(v, ndigits) + 0.0
+    return v
+
+
+def _round_record(rec, ndigits):
+    return {k: _round_value(v, ndigits) for k, v in rec.items()}
+
+
+def make_encoder(precision):
+    # Returns encode(obj) -> bytes for a record dict or a bare point array,
+    # using orjson when installed, otherwise the stdlib encoder.
+    def prepare(obj):
+        return _round_record(obj, precision) if isinstance(obj, dict) else _round_value(obj, precision)
+
+    if orjson is not None:
+        def encode(obj):
+            return orjson.dumps(prepare(obj), default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        # encode() is the one-shot path that uses the C encoder; json.dump(obj, f) does not
+        encoder = json.JSONEncoder(separators=(",", ":"), default=_json_default)
+
+        def encode(obj):
+            return encoder.encode(prepare(obj)).encode("utf-8")
+    return encode
+
+
+class JsonArrayWriter:
+    """
+    Streams records to a binary file as a JSON array, one compact record per line,
+    so only the current batch of geometry is held in memory.
+
+    With f=None the encoded records are kept in memory instead; --workers processes
+    return them via fragment() and the main process appends them with merge().
+    """
+    header = b"["
+
+    def __init__(self, f, precision=6):
+        self.f = f
+        self.count = 0
+        self.encode = make_encoder(precision)
+        self.parts = []
+        if f is not None:
+            f.write(self.header)
+
+    def write(self, rec):
+        self._add(self.encode(rec))
+
+    def _add(self, data):
+        if self.f is None:
+            self.parts.append(data)
+        else:
+            self._write_items(data, 1)
+
+    def _write_items(self, data, count):
+        # data: count already-encoded items joined by b",\n"
+        if count == 0:
+            return
+        self.f.write(b"\n" if self.count == 0 else b",\n")
+        self.f.write(data)
+        self.count += count
+
+    def fragment(self):
+        return b",\n".join(self.parts), len(self.parts)
+
+    def merge(self, fragment):
+        self._write_items(*fragment)
+
+    def close(self):
+        self.f.write(b"\n]\n")
+
+
+class ColumnarWriter(JsonArrayWriter):
+    """
+    Writes {"polylines": [[[x, y], ...], ...], "circles": {"cx": [...], "cy": [...], "r": [...]}, "arcs": {...}}:
+    bare point arrays instead of one dict per polyline, and one column per field for the
+    parametric records. Polylines are streamed; the columns are small and written by close().
+
+    Each parametric table also has an "i" column: the record's position in the array layout,
+    so readers can restore the original entity order (polylines fill the remaining positions).
+    """
+    header = b'{"polylines":['
+
+    def __init__(self, f, precision=6):
+        self.columns = {}
+        self.records = 0
+        super().__init__(f, precision)
+
+    def write(self, rec):
+        kind = rec["type"]
+        if kind == "polyline":
+            self._add(self.encode(rec["points"]))
+        else:
+            table = self.columns.setdefault(kind + "s", {})
+            for k, v in rec.items():
+                if k != "type":
+                    table.setdefault(k, []).append(v)
+            table.setdefault("i", []).append(self.records)
+        self.records += 1
+
+    def fragment(self):
+        return b",\n".join(self.parts), len(self.parts), self.columns, self.records
+
+    def merge(self, fragment):
+        data, count, columns, records = fragment
+        self._write_items(data, count)
+        # fragment positions are relative to the fragment; shift them past what is already written
+        offset = self.records
+        for name, table in columns.items():
+            dst = self.columns.setdefault(name, {})
+            for k, vals in table.items():
+                if k == "i":
+                    vals = [i + offset for i in vals]
+                dst.setdefault(k, []).extend(vals)
+        self.records += records
+
+    def close(self):
+        self.f.write(b"\n]")
+        for name, table in self.columns.items():
+            self.f.write(b',\n"' + name.encode("ascii") + b'":' + self.encode(table))
+        self.f.write(b"}\n")
+
+
+# max deviation (drawing units) between a SPLINE and its flattened polyline
+SPLINE_FLATTEN_DISTANCE = 0.01
+
+
+def spline_to_poly(spline, distance=SPLINE_FLATTEN_DISTANCE):
+    # Best-effort sampling: prefer fit_points, otherwise let ezdxf flatten the B-spline
+    # (curvature-adaptive, within distance of the true curve). Returns an (n, 2) array.
+    if hasattr(spline, "fit_points") and spline.fit_points:
+        return np.array([(p[0], p[1]) for p in spline.fit_points], dtype=np.float64)
+    if len(spline.control_points):
+        coords = (c for v in spline.flattening(distance) for c in (v.x, v.y))
+        return np.fromiter(coords, dtype=np.float64).reshape(-1, 2)
+    return np.empty((0, 2))
+
+
+def _line(e, out, approx_segs, parent_transform):
+    dxf = e.dxf
+    start = dxf.start
+    end = dxf.end
+    x0 = float(start[0]); y0 = float(start[1])
+    x1 = float(end[0]); y1 = float(end[1])
+    if parent_transform:
+        f = point_xformer(parent_transform)
+        pts = [f(x0, y0), f(x1, y1)]
+    else:
+        pts = [(x0, y0), (x1, y1)]
+    out.append({"type": "polyline", "points": pts})
+
+
+def dedupe_consecutive(pts):
+    # Drops vertices identical to their predecessor (common in machine-generated DXFs).
+    if len(pts) < 2:
+        return pts
+    keep = np.empty(len(pts), dtype=bool)
+    keep[0] = True
+    np.any(np.diff(pts, axis=0) != 0.0, axis=1, out=keep[1:])
+    return pts if keep.all() else pts[keep]
+
+
+def _lwpolyline(e, out, approx_segs, parent_transform):
+    # get_points("xy") yields (x, y) tuples only; one contiguous (n, 2) array, no per-vertex lists
+    pts = dedupe_consecutive(np.array(e.get_points("xy"), dtype=np.float64).reshape(-1, 2))
+    if parent_transform:
+        pts = apply_xform(pts, parent_transform)
+    out.append({"type": "polyline", "points": pts})
+
+
+def _polyline(e, out, approx_segs, parent_transform):
+    # points() yields each VERTEX location as a Vec3
+    pts = dedupe_consecutive(np.array([(p.x, p.y) for p in e.points()], dtype=np.float64).reshape(-1, 2))
+    if parent_transform:
+        pts = apply_xform(pts, parent_transform)
+    if len(pts):
+        out.append({"type": "polyline", "points": pts})
+
+
+def conformal_scale(M):
+    # Scale factor when M maps circles to circles (uniform scale + rotation, optionally mirrored), else None.
+    n0 = math.hypot(M[0, 0], M[1, 0])
+    n1 = math.hypot(M[0, 1], M[1, 1])
+    tol = 1e-9 * max(n0, n1, 1.0)
+    if abs(n0 - n1) > tol or abs(M[0, 0] * M[0, 1] + M[1, 0] * M[1, 1]) > tol * max(n0, 1.0):
+        return None
+    return n0
+
+
+def _map_angle(M, deg):
+    # Direction of the unit vector at deg after M, in degrees [0, 360).
+    a = math.radians(deg)
+    ca = math.cos(a); sa = math.sin(a)
+    return math.degrees(math.atan2(M[1, 0] * ca + M[1, 1] * sa, M[0, 0] * ca + M[0, 1] * sa)) % 360.0
+
+
+def _circle_record(cx, cy, r, xform):
+    # Parametric record in world coordinates; None if the transform turns the circle into an ellipse.
+    if xform:
+        s = conformal_scale(xform[0])
+        if s is None:
+            return None
+        cx, cy = point_xformer(xform)(cx, cy)
+        r *= s
+    return {"type": "circle", "cx": cx, "cy": cy, "r": r}
+
+
+def _arc_sweep(sa, ea):
+    # Counter-clockwise sweep in degrees from sa to ea, normalized the same way sample_arcs() does.
+    sweep = ea - sa
+    if sweep < 0.0:
+        sweep += 360.0
+    return sweep
+
+
+def _point_record(cx, cy, xform):
+    # Zero-radius circle/arc (an authoring artifact): a single point instead of approx_segs+1 copies of it.
+    if xform:
+        cx, cy = point_xformer(xform)(cx, cy)
+    return {"type": "point", "cx": cx, "cy": cy}
+
+
+def _arc_record(cx, cy, r, sa, ea, xform):
+    if xform:
+        M = xform[0]
+        s = conformal_scale(M)
+        if s is None:
+            return None
+        cx, cy = point_xformer(xform)(cx, cy)
+        r *= s
+        # only one endpoint is mapped and the sweep is carried over, so a full turn stays a full turn
+        sweep = _arc_sweep(sa, ea)
+        # a mirrored transform reverses the sweep, so the mapped end becomes the new start
+        if M[0, 0] * M[1, 1] - M[0, 1] * M[1, 0] < 0:
+            sa = _map_angle(M, ea)
+        else:
+            sa = _map_angle(M, sa)
+        ea = sa + sweep
+    return {"type": "arc", "cx": cx, "cy": cy, "r": r, "start": sa, "end": ea}
+
+
+def _emit_sampled(params, slots, arc_polylines, make_record, sample):
+    # Shared tail of _circles()/_arcs(). params: [(slot_index, parent_transform, geometry), ...] where
+    # geometry is the make_record() arguments; sample(arr) turns the (n, len(geometry)) array of the
+    # entities that need a polyline into (n, approx_segs+1, 2) points, all in one call.
+    recs = [make_record(*g, xform) for i, xform, g in params]
+    sampled = [k for k, rec in enumerate(recs) if arc_polylines or rec is None]
+    if sampled:
+        polys = sample(np.array([params[k][2] for k in sampled]))
+        for j, k in enumerate(sampled):
+            i, xform, g = params[k]
+            pts = polys[j]
+            if xform:
+                # approximate by transforming sampled points
+                pts = apply_xform(pts, xform)
+            slots[i].append({"type": "polyline", "points": pts})
+    for (i, xform, g), rec in zip(params, recs):
+        if rec is not None:
+            slots[i].append(rec)
+
+
+def _circles(items, slots, approx_segs, arc_polylines=True):
+    # items: [(slot_index, entity, parent_transform), ...]; all circles are sampled in one call.
+    # With arc_polylines off, only circles the parametric record cannot represent are sampled.
+    params = []
+    add = params.append
+    for i, e, xform in items:
         try:
-            start = [float(e.dxf.start[0]), float(e.dxf.start[1])]
-            end = [float(e.dxf.end[0]), float(e.dxf.end[1])]
-            if parent_transform:
-                start = transform_point(start, *parent_transform)
-                end = transform_point(end, *parent_transform)
-            out.append({"type": "polyline", "points": [start, end]})
+            dxf = e.dxf
+            c = dxf.center
+            cx = float(c[0]); cy = float(c[1]); r = float(dxf.radius)
+            if r <= 0.0:
+                slots[i].append(_point_record(cx, cy, xform))
+                continue
+            add((i, xform, (cx, cy, r)))
         except Exception as ex:
-            print("Warning: LINE processing error: " + str(ex), file=sys.stderr)
+            print("Warning: CIRCLE error: " + str(ex), file=sys.stderr)
+    if not params:
+        return
 
-    elif t == "LWPOLYLINE":
-        try:
-            pts_raw = list(e.get_points())
-            pts = [[float(x), float(y)] for (x, y, *rest) in pts_raw]
-            if parent_transform:
-                pts = [transform_point(p, *parent_transform) for p in pts]
-            out.append({"type": "polyline", "points": pts})
-        except Exception as ex:
-            print("Warning: LWPOLYLINE error: " + str(ex), file=sys.stderr)
+    def sample(arr):
+        return sample_circles(arr[:, :2], arr[:, 2], segments=approx_segs)
 
-    elif t == "POLYLINE":
-        try:
-            pts = []
-            for v in e.vertices():
-                pts.append([float(v.dxf.x), float(v.dxf.y)])
-            if parent_transform:
-                pts = [transform_point(p, *parent_transform) for p in pts]
-            if pts:
-                out.append({"type": "polyline", "points": pts})
-        except Exception as ex:
-            print("Warning: POLYLINE error: " + str(ex), file=sys.stderr)
+    _emit_sampled(params, slots, arc_polylines, _circle_record, sample)
 
-    elif t == "CIRCLE":
-        try:
-            cx = float(e.dxf.center[0]); cy = float(e.dxf.center[1]); r = float(e.dxf.radius)
-            if parent_transform:
-                # approximate by transforming sampled points
-                pts = sample_circle(0, 0, r, segments=approx_segs)
-                pts = [transform_point([p[0] + cx, p[1] + cy], *parent_transform) for p in pts]
-                out.append({"type": "polyline", "points": pts})
-            else:
-                out.append({"type": "polyline", "points": sample_circle(cx, cy, r, segments=approx_segs)})
-            out.append({"type": "circle", "cx": cx, "cy": cy, "r": r})
-        except Exception as ex:
-            print("Warning: CIRCLE error: " + str(ex), file=sys.stderr)
 
-    elif t == "ARC":
+def _arcs(items, slots, approx_segs, arc_polylines=True):
+    params = []
+    add = params.append
+    for i, e, xform in items:
         try:
-            cx = float(e.dxf.center[0]); cy = float(e.dxf.center[1]); r = float(e.dxf.radius)
-            sa = float(e.dxf.start_angle); ea = float(e.dxf.end_angle)
-            if parent_transform:
-                pts = sample_arc(0, 0, r, sa, ea, segments=approx_segs)
-                pts = [transform_point([p[0] + cx, p[1] + cy], *parent_transform) for p in pts]
-                out.append({"type": "polyline", "points": pts})
-            else:
-                out.append({"type": "polyline", "points": sample_arc(cx, cy, r, sa, ea, segments=approx_segs)})
-            out.append({"type": "arc", "cx": cx, "cy": cy, "r": r, "start": sa, "end": ea})
+            dxf = e.dxf
+            c = dxf.center
+            cx = float(c[0]); cy = float(c[1]); r = float(dxf.radius)
+            sa = float(dxf.start_angle); ea = float(dxf.end_angle)
+            if abs(_arc_sweep(sa, ea)) < 1e-9:
+                continue
+            if r <= 0.0:
+                slots[i].append(_point_record(cx, cy, xform))
+                continue
+            add((i, xform, (cx, cy, r, sa, ea)))
         except Exception as ex:
             print("Warning: ARC error: " + str(ex), file=sys.stderr)
-
-    elif t == "ELLIPSE":
+    if not params:
+        return
+
+    def sample(arr):
+        return sample_arcs(arr[:, :2], arr[:, 2], arr[:, 3], arr[:, 4], segments=approx_segs)
+
+    _emit_sampled(params, slots, arc_polylines, _arc_record, sample)
+
+
+def _ellipse(e, out, approx_segs, parent_transform):
+    cx = float(e.dxf.center[0]); cy = float(e.dxf.center[1])
+    maj = e.dxf.major_axis
+    rx = math.hypot(maj[0], maj[1])
+    ratio = float(e.dxf.ratio)
+    ry = rx * ratio
+    uc, us = unit_circle(approx_segs)
+    xy = np.column_stack([rx * uc, ry * us])
+    # orient along the major axis, then fold any parent transform into the same 2x2 + offset
+    theta = math.atan2(maj[1], maj[0])
+    ct = math.cos(theta); st = math.sin(theta)
+    xform = (np.array([[ct, -st], [st, ct]]), np.array([cx, cy]))
+    if parent_transform:
+        xform = compose_xform(parent_transform, xform)
+    pts = apply_xform(xy, xform)
+    out.append({"type": "polyline", "points": pts})
+
+
+def _spline(e, out, approx_segs, parent_transform):
+    pts = spline_to_poly(e)
+    if parent_transform:
+        pts = apply_xform(pts, parent_transform)
+    if len(pts):
+        out.append({"type": "polyline", "points": pts})
+
+
+def _insert_xform(e, verbose):
+    # Placement transform of an INSERT, or None if its attributes cannot be read.
+    try:
+        name = e.dxf.name
+        insert_pt = [float(e.dxf.insert[0]), float(e.dxf.insert[1])]
+        sx = float(getattr(e.dxf, "xscale", 1.0))
+        sy = float(getattr(e.dxf, "yscale", 1.0))
+        rotation = float(getattr(e.dxf, "rotation", 0.0))
+        if verbose:
+            print(f"Expanding INSERT '{name}' at {insert_pt} sx={sx} sy={sy} rot={rotation}", file=sys.stderr)
+        return make_xform(insert_pt, sx, sy, rotation)
+    except Exception as ex:
+        print("Warning: INSERT expansion failed: " + str(ex), file=sys.stderr)
+        return None
+
+
+# (block name, approx_segs) -> (coords, entries): the block's geometry sampled once in block-local coordinates.
+# coords is one (P, 2) array holding every template polyline; entries are (kind, record, lo, hi)
+# with coords[lo:hi] the polyline (empty for points). None marks a block still being built.
+_block_cache = {}
+
+
+def _compile_template(records):
+    # Splits records into parametric entries and joins the polylines into one contiguous array.
+    entries = []
+    chunks = []
+    n = 0
+    for rec in records:
+        kind = rec["type"]
+        if kind == "polyline":
+            pts = np.asarray(rec["points"], dtype=np.float64).reshape(-1, 2)
+            chunks.append(pts)
+            entries.append(("polyline", None, n, n + len(pts)))
+            n += len(pts)
+        elif kind != "point" and entries and entries[-1][0] == "polyline":
+            # circle/arc handlers emit the sampled polyline right before the record it approximates
+            entries[-1] = (kind, rec) + entries[-1][2:]
+        else:
+            entries.append((kind, rec, n, n))
+    coords = np.concatenate(chunks) if chunks else np.empty((0, 2))
+    return coords, entries
+
+
+def block_template(e, approx_segs):
+    """
+    Returns the cached (coords, entries) template for the block an INSERT references, building it on
+    first use. Nested INSERTs inside the block are instantiated from their own templates.
+    """
+    name = e.dxf.name
+    key = (name, approx_segs)
+    if key in _block_cache:
+        template = _block_cache[key]
+        if template is None:
+            print(f"Warning: Block '{name}' references itself.", file=sys.stderr)
+            return None
+        return template
+    blk = e.doc.blocks.get(name)
+    if blk is None:
+        print(f"Warning: Block '{name}' not found.", file=sys.stderr)
+        _block_cache[key] = template = (np.empty((0, 2)), [])
+        return template
+    _block_cache[key] = None
+    records = []
+    try:
+        # arc polylines are always kept: a later INSERT may map the circle to an ellipse
+        process_entities(iter_entities(blk.query(entity_query(True)), False), records.append, approx_segs, True)
+    except Exception:
+        del _block_cache[key]
+        raise
+    _block_cache[key] = template = _compile_template(records)
+    return template
+
+
+def write_insert(e, xform, write, approx_segs, arc_polylines=True):
+    # Writes one INSERT's records straight from its block template, mapping all template points with
+    # a single affine; only this instance's geometry is held, however large the block is.
+    try:
+        template = block_template(e, approx_segs)
+        if template is None:
+            return
+        coords, entries = template
+        world = apply_xform(coords, xform)
+        for kind, rec, lo, hi in entries:
+            if kind == "polyline":
+                write({"type": "polyline", "points": world[lo:hi]})
+                continue
+            if kind == "point":
+                cx, cy = point_xformer(xform)(rec["cx"], rec["cy"])
+                write({"type": "point", "cx": cx, "cy": cy})
+                continue
+            if kind == "circle":
+                mapped = _circle_record(rec["cx"], rec["cy"], rec["r"], xform)
+            else:
+                mapped = _arc_record(rec["cx"], rec["cy"], rec["r"], rec["start"], rec["end"], xform)
+            if (arc_polylines or mapped is None) and hi > lo:
+                write({"type": "polyline", "points": world[lo:hi]})
+            if mapped is not None:
+                write(mapped)
+    except Exception as ex:
+        print("Warning: INSERT error: " + str(ex), file=sys.stderr)
+
+
+# per-type geometry handlers: handler(entity, out, approx_segs, parent_transform)
+HANDLERS = {
+    "LINE": _line,
+    "LWPOLYLINE": _lwpolyline,
+    "POLYLINE": _polyline,
+    "ELLIPSE": _ellipse,
+    "SPLINE": _spline,
+}
+
+# types sampled together across a batch: handler(items, slots, approx_segs, arc_polylines)
+BATCH_HANDLERS = {
+    "CIRCLE": _circles,
+    "ARC": _arcs,
+}
+
+# entities buffered per process_batch() call; bounds memory while still vectorizing across entities
+BATCH_SIZE = 1024
+
+
+def entity_query(explode_blocks):
+    # ezdxf query string selecting only the types we handle; everything else (TEXT, HATCH, ...) is skipped by ezdxf
+    types = list(HANDLERS) + list(BATCH_HANDLERS)
+    if explode_blocks:
+        types.append("INSERT")
+    return " ".join(types)
+
+
+def iter_entities(entities, verbose):
+    """
+    Yields (entity, parent_transform) for every geometry entity in entities (already filtered by
+    entity_query()). INSERTs are yielded with their placement transform and written by write_insert().
+    """
+    counts = {}
+    for e in entities:
+        t = e.dxftype()
+        if verbose:
+            counts[t] = counts.get(t, 0) + 1
+        if t == "INSERT":
+            xform = _insert_xform(e, verbose)
+            if xform is not None:
+                yield e, xform
+        else:
+            yield e, None
+    if verbose:
+        print("Processed entities: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())), file=sys.stderr)
+
+
+def process_batch(batch, write, approx_segs, arc_polylines=True):
+    """
+    Passes the records for a run of (entity, parent_transform) pairs to write(), in their original order.
+    Entities with a batch handler are grouped per type and sampled with one NumPy call per group.
+    """
+    slots = [[] for _ in batch]
+    grouped = {}
+    # module globals and bound methods hoisted into locals for the per-entity loop
+    handlers = HANDLERS
+    batch_handlers = BATCH_HANDLERS
+    group = grouped.setdefault
+    for i, (e, xform) in enumerate(batch):
+        t = e.dxftype()
+        if t in batch_handlers:
+            group(t, []).append((i, e, xform))
+            continue
+        # the only exception boundary per entity: handlers themselves run without try/except
         try:
-            cx = float(e.dxf.center[0]); cy = float(e.dxf.center[1])
-            maj = e.dxf.major_axis
-            rx = math.hypot(maj[0], maj[1])
-            ratio = float(e.dxf.ratio)
-            ry = rx * ratio
-            pts = []
-            for i in range(approx_segs):
-                a = 2 * math.pi * i / approx_segs
-                pts.append([cx + rx * math.cos(a), cy + ry * math.sin(a)])
-            if parent_transform:
-                pts = [transform_point(p, *parent_transform) for p in pts]
-            out.append({"type": "polyline", "points": pts})
+            handlers[t](e, slots[i], approx_segs, xform)
         except Exception as ex:
-            print("Warning: ELLIPSE error: " + str(ex), file=sys.stderr)
-
-    elif t == "SPLINE":
+            print(f"Warning: {t} error: {ex}", file=sys.stderr)
+    for t, items in grouped.items():
         try:
-            pts = spline_to_poly(e, segments=approx_segs)
-            if parent_transform:
-                pts = [transform_point(p, *parent_transform) for p in pts]
-            if pts:
-                out.append({"type": "polyline", "points": pts})
+            batch_handlers[t](items, slots, approx_segs, arc_polylines)
         except Exception as ex:
-            print("Warning: SPLINE error: " + str(ex), file=sys.stderr)
-
-    elif t == "INSERT" and explode_blocks:
-        # Expand the block definition (INSERT)
+            print(f"Warning: {t} batch error: {ex}", file=sys.stderr)
+    for recs in slots:
+        for rec in recs:
+            write(rec)
+
+
+def process_entities(items, write, approx_segs, arc_polylines=True):
+    # items: iterable of (entity, parent_transform); processed in runs of BATCH_SIZE.
+    # An INSERT ends the current run and is written on its own, so a batch never holds block expansions.
+    batch = []
+    add = batch.append
+    size = BATCH_SIZE
+    for item in items:
+        if item[0].dxftype() == "INSERT":
+            if batch:
+                process_batch(batch, write, approx_segs, arc_polylines)
+                batch = []
+                add = batch.append
+            write_insert(item[0], item[1], write, approx_segs, arc_polylines)
+            continue
+        add(item)
+        if len(batch) >= size:
+            process_batch(batch, write, approx_segs, arc_polylines)
+            batch = []
+            add = batch.append
+    process_batch(batch, write, approx_segs, arc_polylines)
+
+
+def read_document(path):
+    # Reads through a read-only memory map: the OS pages the DXF in on demand and ezdxf's
+    # readline()-based tag loader works on the mapping directly, without a second Python-side buffer.
+    with open(path, "rb") as fh:
         try:
-            name = e.dxf.name
-            insert_pt = [float(e.dxf.insert[0]), float(e.dxf.insert[1])]
-            sx = float(getattr(e.dxf, "xscale", 1.0))
-            sy = float(getattr(e.dxf, "yscale", 1.0))
-            rotation = float(getattr(e.dxf, "rotation", 0.0))
-            if verbose:
-                print(f"Expanding INSERT '{name}' at {insert_pt} sx={sx} sy={sy} rot={rotation}", file=sys.stderr)
-            # find block and iterate block entities
-            blk = doc.blocks.get(name)
-            if blk is None:
-                print(f"Warning: Block '{name}' not found.", file=sys.stderr)
-            else:
-                for be in blk:
-                    # process each entity in block with transform
-                    process_entity(be, out, approx_segs, explode_blocks, verbose, doc, parent_transform=(insert_pt, sx, sy, rotation))
-        except Exception as ex:
-            print("Warning: INSERT expansion failed: " + str(ex), file=sys.stderr)
-
-    else:
-        # ignore unsupported or non-geometry types (HATCH, TEXT, ATTRIB, etc.)
-        if verbose:
-            print(f"Ignored entity type: {t}", file=sys.stderr)
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # empty or unmappable files (pipes, some network shares)
+            return recover.readfile(path)
+        with mm:
+            doc, auditor = recover.read(mm)
+    doc.filename = path
+    return doc, auditor
+
+
+def load_document(path):
+    # (doc, None) on success, otherwise (None, (exit_code, message)) for main() to report.
+    try:
+        doc, auditor = read_document(path)
+        if doc is None:
+            return None, (4, "ezdxf failed to read file. Auditor: " + str(auditor))
+    except Exception as ex:
+        return None, (5, "ezdxf failed: " + str(ex))
+    return doc, None
+
+
+# per-process state for --workers; ezdxf entities cannot be pickled, so each worker loads the DXF once
+_worker = {}
+
+
+def _worker_init(path, explode_blocks, approx_segs, arc_polylines, writer_cls, precision):
+    # Read errors are kept and reported through _worker_count() rather than breaking the pool.
+    doc, error = load_document(path)
+    _worker.update(
+        doc=doc,
+        error=error,
+        entities=list(doc.modelspace().query(entity_query(explode_blocks))) if doc is not None else [],
+        approx_segs=approx_segs,
+        arc_polylines=arc_polylines,
+        writer_cls=writer_cls,
+        precision=precision,
+    )
+
+
+def _worker_count():
+    return len(_worker["entities"]), _worker["error"]
+
+
+def _worker_run(lo, hi):
+    # Processes top-level entities [lo, hi) and returns the writer fragment for the main process to merge.
+    w = _worker
+    writer = w["writer_cls"](None, w["precision"])
+    # verbose diagnostics stay in the main process; workers only report warnings
+    items = iter_entities(w["entities"][lo:hi], False)
+    process_entities(items, writer.write, w["approx_segs"], w["arc_polylines"])
+    return writer.fragment()
+
+
+def start_workers(args, workers, writer_cls):
+    """
+    Starts the --workers pool and returns (pool, entity_count, error). The main process never parses
+    the DXF in this mode: every worker parses it once, all at the same time, and the count comes back
+    from them. Parsing itself is not split, so wall time is still at least one full parse; only
+    processing and encoding run in parallel.
+    """
+    initargs = (args.input, args.explode_inserts, args.approx_segs, not args.no_arc_polyline,
+                writer_cls, args.precision)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init, initargs=initargs)
+    # one request per worker so every process starts (and parses) now, not when the chunks arrive
+    counts = [pool.submit(_worker_count) for _ in range(workers)]
+    count, error = counts[0].result()
+    return pool, count, error
+
+
+def write_parallel(pool, workers, count, writer):
+    # Splits the top-level entities into contiguous chunks; results are written back in order.
+    chunks = min(count, workers * 4) or 1
+    bounds = [count * i // chunks for i in range(chunks + 1)]
+    for fragment in pool.map(_worker_run, bounds[:-1], bounds[1:]):
+        writer.merge(fragment)
 
 
 def main():
@@ -210,6 +815,15 @@ def main():
     parser.add_argument("output", help="Output JSON file")
     parser.add_argument("--approx-segs", type=int, default=36, help="Segments for arc/circle approximation")
     parser.add_argument("--explode-inserts", action="store_true", help="Explode INSERT/BLOCKs into geometry")
+    parser.add_argument("--no-arc-polyline", action="store_true",
+                        help="Emit only circle/arc records, without the sampled polyline, where they are exact")
+    parser.add_argument("--precision", type=int, default=6, help="Decimal places kept for output coordinates")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Write {polylines: [...], circles: {cx, cy, r}, arcs: {...}} instead of a record array")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for entity processing (0 = one per CPU). Every worker parses "
+                             "the whole DXF, so this only pays off when processing, not parsing, dominates; "
+                             "memory grows with one parsed document per worker")
     parser.add_argument("--verbose", action="store_true", help="Verbose output to stderr")
     args = parser.parse_args()
 
@@ -217,34 +831,40 @@ def main():
         print("Input not found: " + args.input, file=sys.stderr)
         sys.exit(3)
 
+    writer_cls = ColumnarWriter if args.columnar else JsonArrayWriter
+    workers = args.workers or os.cpu_count() or 1
+    pool = None
+    if workers != 1:
+        pool, count, error = start_workers(args, workers, writer_cls)
+    else:
+        doc, error = load_document(args.input)
+    if error:
+        if pool is not None:
+            pool.shutdown()
+        print(error[1], file=sys.stderr)
+        sys.exit(error[0])
+
+    # stream JSON while processing
     try:
-        doc, auditor = recover.readfile(args.input)
-        if doc is None:
-            print("ezdxf failed to read file. Auditor: " + str(auditor), file=sys.stderr)
-            sys.exit(4)
-    except Exception as ex:
-        print("ezdxf failed: " + str(ex), file=sys.stderr)
-        sys.exit(5)
-
-    modelspace = doc.modelspace()
-    out = []
-
-    for e in modelspace:
-        try:
-            process_entity(e, out, args.approx_segs, args.explode_inserts, args.verbose, doc)
-        except Exception as ex:
-            print(f"Warning: failed to process top-level entity {e.dxftype()}: {ex}", file=sys.stderr)
-
-    # write JSON
-    try:
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2)
-        print(args.output)
-        sys.exit(0)
+        with open(args.output, "wb") as f:
+            writer = writer_cls(f, precision=args.precision)
+            if pool is not None:
+                if args.verbose:
+                    print(f"Processing {count} entities with {workers} workers", file=sys.stderr)
+                with pool:
+                    write_parallel(pool, workers, count, writer)
+            else:
+                entities = doc.modelspace().query(entity_query(args.explode_inserts))
+                process_entities(iter_entities(entities, args.verbose),
+                                 writer.write, args.approx_segs, not args.no_arc_polyline)
+            writer.close()
     except Exception as ex:
         print("Failed to write JSON: " + str(ex), file=sys.stderr)
         sys.exit(6)
 
+    print(args.output)
+    sys.exit(0)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file